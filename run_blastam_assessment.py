@@ -241,6 +241,40 @@ def koshimizu_model(temp_5d, wind_5d, rainfall_5d, sun_shine_5d):
                              'wet_avg_temp': temp_avg, 'blast_score': blast_score}
 
 
+def prescreen_no_wet_period(wind_5d, rainfall_5d, sun_shine_5d):
+    """
+    以 NumPy 一次預篩多個 5 日視窗（各為 shape (n, 120) 的陣列）。
+    對 16 時至隔日 15 時的每個小時，依 koshimizu_model 的規則推出
+    「可能濕潤」的上界；若上界不足 10 小時，濕潤時間必 < 10，
+    模型分數必為 -1。回傳 bool 陣列，True 代表可直接給 -1。
+    """
+    n = rainfall_5d.shape[0]
+
+    # 基準1（索引 88–103）：葉面濕潤須由 89–103 某時的降雨開始，
+    # 且當時風速 >= 4、或無雨而風速 >= 3 時一定中斷
+    onset = np.logical_or.accumulate(rainfall_5d[:, 89:104] > 0, axis=1)
+    onset = np.concatenate([onset, onset[:, -1:]], axis=1)
+    wind_c1 = wind_5d[:, 88:104]
+    rain_c1 = rainfall_5d[:, 88:104]
+    wet_c1 = onset & (wind_c1 < 4) & ((rain_c1 > 0) | (wind_c1 < 3))
+
+    # 基準2（索引 104–111，即 8–15 時）：推定或補連續時皆須日照 <= 0.1 且風速 <= 3
+    wet_c2 = (wind_5d[:, 104:112] <= 3) & (sun_shine_5d[:, 104:112] <= 0.1)
+    possible = np.concatenate([wet_c1, wet_c2], axis=1)
+
+    # 基準5：降雨 > 4mm 前後 9 小時視為無效（-2）；第 40 時對應回 16 時
+    heavy = rainfall_5d[:, 88:112] > 4
+    csum = np.concatenate([np.zeros((n, 1), dtype=int), np.cumsum(heavy, axis=1)], axis=1)
+    pos = np.arange(24)
+    lo = np.clip(pos - 9, 0, 24)
+    hi = np.clip(pos + 10, 0, 24)
+    ineffective = (csum[:, hi] - csum[:, lo]) > 0
+    ineffective[:, 0] |= heavy[:, 15:].any(axis=1)
+    possible &= ~ineffective
+
+    return possible.sum(axis=1) < 10
+
+
 
 
 def calculate_blast_risk(station_id, date_str, base_dir):
@@ -287,6 +321,110 @@ def calculate_blast_risk(station_id, date_str, base_dir):
         return None
 
 
+def calculate_blast_risk_batch(station_id, date_strs, base_dir):
+    """
+    一次計算同一站點多個日期的風險分數，結果與逐日呼叫 calculate_blast_risk 相同。
+    月檔只讀一次；各視窗的篩選與品質檢查沿用 calculate_blast_risk，
+    預篩可證明為 -1 的視窗直接給分，其餘才跑完整模型。
+    回傳 ({date_str: blast_score}, 預篩略過的視窗數)，無法計算的日期不列入。
+    """
+    model_cols = ['気温(℃)', '風速(m/s)', '降水量(mm)', '日照時間(時間)']
+    other_cols = model_cols[:3]
+
+    windows = []
+    for date_str in date_strs:
+        try:
+            date = pd.to_datetime(date_str)
+            windows.append((date_str, date - timedelta(days=4), date.replace(hour=23)))
+        except Exception as e:
+            logger.error(f"處理 {station_id} {date_str} 時發生例外: {e}")
+    if not windows:
+        return {}, 0
+
+    try:
+        # 逐月讀檔並記下來源月份與欄位，以便每個視窗只取 calculate_blast_risk 會讀到的月份
+        dfs = []
+        month_cols = {}
+        dt = min(w[1] for w in windows).replace(day=1)
+        last = max(w[2] for w in windows)
+        while dt <= last:
+            df = read_weather_data(base_dir, station_id, dt.year, dt.month)
+            if df is not None:
+                month = dt.year * 12 + dt.month
+                month_cols[month] = set(df.columns)
+                df['來源月份'] = month
+                dfs.append(df)
+            dt = (dt + timedelta(days=32)).replace(day=1)
+        if not dfs:
+            logger.error(f"站點 {station_id} 在 {min(w[1] for w in windows)} 至 {last} 期間無資料")
+            return {}, 0
+        combined = pd.concat(dfs, ignore_index=True)
+        # 所有月份都缺的欄位先補 NaN；用到這些月份的視窗會在下面跳過
+        for col in model_cols:
+            if col not in combined.columns:
+                combined[col] = np.nan
+
+        times = pd.to_datetime(combined['年月日時']).values
+        source_month = combined['來源月份'].values
+        nan_mask = combined[other_cols].isna().values
+        temp, wind, rain, sun = prepare_model_input(combined)
+    except Exception as e:
+        # 共用前處理失敗時退回逐日計算，確保每個日期的成敗與 calculate_blast_risk 一致
+        logger.warning(f"{station_id} 批次前處理失敗，改為逐日計算: {e}")
+        scores = {}
+        for date_str, _, _ in windows:
+            res = calculate_blast_risk(station_id, date_str, base_dir)
+            if res is not None:
+                scores[date_str] = res['blast_score']
+        return scores, 0
+
+    keys, rows = [], []
+    for date_str, start, end in windows:
+        start_month = start.year * 12 + start.month
+        end_month = end.year * 12 + end.month
+        # calculate_blast_risk 只合併這些月份，若其中沒有任何月份具備某欄位會 KeyError
+        cols = set().union(*(c for m, c in month_cols.items() if start_month <= m <= end_month))
+        missing = [col for col in model_cols if col not in cols]
+        if missing:
+            logger.error(f"處理 {station_id} {date_str} 時發生例外: 缺少欄位 {missing}")
+            continue
+        mask = ((times >= start.to_datetime64()) & (times <= end.to_datetime64())
+                & (source_month >= start_month) & (source_month <= end_month))
+        idx = np.flatnonzero(mask)
+        if idx.size != 120:
+            logger.error(f"{station_id} {date_str} 資料長度 {idx.size} != 120")
+            continue
+        nan_counts = nan_mask[idx].sum(axis=0)
+        if (nan_counts > 20).any():
+            logger.warning(f"{station_id} {date_str} NaN 數量 {dict(zip(other_cols, nan_counts))}，品質不足，跳過")
+            continue
+        keys.append(date_str)
+        rows.append(idx)
+    if not rows:
+        return {}, 0
+
+    rows = np.array(rows)
+    screened = prescreen_no_wet_period(wind[rows], rain[rows], sun[rows])
+    scores = {}
+    for key, idx, skip in zip(keys, rows, screened):
+        try:
+            if skip and not DEBUG:
+                scores[key] = -1
+                continue
+            # fancy indexing 產生副本，模型對日照陣列的就地修改不會影響其他視窗
+            _, res = koshimizu_model(temp[idx], wind[idx], rain[idx], sun[idx])
+            if skip:
+                # DEBUG 時對預篩略過的視窗仍跑完整模型，確認結果一致
+                assert res['blast_score'] == -1, f"{station_id} {key} 預篩判定 -1，模型為 {res['blast_score']}"
+            scores[key] = res['blast_score']
+        except AssertionError:
+            raise
+        except Exception as e:
+            logger.error(f"處理 {station_id} {key} 時發生例外: {e}")
+    logger.debug(f"{station_id} 預篩略過 {int(screened.sum())}/{len(keys)} 個視窗")
+    return scores, int(screened.sum())
+
+
 def main():
     base_dir = './weather_data_repo/weather_data'
     if DEBUG:
@@ -298,16 +436,25 @@ def main():
     if DEBUG:
         dates = [(datetime.now() - timedelta(days=3)).strftime('%Y-%m-%d')]
 
+    # 逐站一次算完所有日期，再依日期寫檔
+    results_by_date = {date: [] for date in dates}
+    screened_total = 0
+    scored_total = 0
+    for station in sorted(os.listdir(base_dir)):
+        path = os.path.join(base_dir, station)
+        if not os.path.isdir(path):
+            continue
+        logger.info(f"開始評估: {station}")
+        scores, screened = calculate_blast_risk_batch(station, dates, base_dir)
+        for date, score in scores.items():
+            results_by_date[date].append([station, score])
+        screened_total += screened
+        scored_total += len(scores)
+    if scored_total:
+        logger.info(f"預篩直接判定 -1: {screened_total}/{scored_total} ({screened_total / scored_total:.1%})")
+
     for date in dates:
-        logger.info(f"開始評估: {date}")
-        results = []
-        for station in sorted(os.listdir(base_dir)):
-            path = os.path.join(base_dir, station)
-            if not os.path.isdir(path):
-                continue
-            res = calculate_blast_risk(station, date, base_dir)
-            if res is not None:
-                results.append([station, res['blast_score']])
+        results = results_by_date[date]
         out = pd.DataFrame(results, columns=['Station ID', 'Blast Score'])
         fn = os.path.join(result_dir, f"{date}.csv")
         out.to_csv(fn, index=False)